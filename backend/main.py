@@ -1274,7 +1274,7 @@ async def chat_message(request: Request, chat_request: ChatRequest):
         if chat_request.use_web_search and WEB_SEARCH_ENABLED:
             try:
                 logger.info(f"Performing web search for query: {chat_request.message}")
-                web_search_results = web_search_service.search_and_extract(chat_request.message, num_results=3)
+                web_search_results = await web_search_service.search_and_extract_async(chat_request.message, num_results=3)
                 
                 if web_search_results.get('success') and web_search_results.get('extracted_content'):
                     # Log details for debugging
@@ -1396,8 +1396,8 @@ async def web_search_endpoint(request: Request, search_request: WebSearchRequest
     try:
         logger.info(f"Web search request from user: {user_id}, query: {search_request.query}")
         
-        search_results = web_search_service.search_and_extract(
-            search_request.query, 
+        search_results = await web_search_service.search_and_extract_async(
+            search_request.query,
             search_request.num_results
         )
         
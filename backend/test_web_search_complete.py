@@ -8,6 +8,7 @@ import requests
 import json
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any
 
 # Test configuration
@@ -321,25 +322,37 @@ def main():
     print("🚀 COMPREHENSIVE WEB SEARCH FEATURE TEST SUITE")
     print("=" * 60)
     
-    tests = [
+    # Health checks run first (they gate everything else); the remaining
+    # tests hit independent endpoints, so they run concurrently and total
+    # wall time drops from sum-of-latencies to max-of-latencies.
+    health_tests = [
         ("Basic Server Health", test_basic_health),
         ("Chat Service Health", test_chat_health),
+    ]
+    parallel_tests = [
         ("Direct Web Search", test_direct_web_search),
         ("Chat with Web Search", test_chat_with_web_search),
         ("Chat without Web Search", test_chat_without_web_search),
         ("Performance Testing", test_performance)
     ]
-    
+
     results = []
     start_time = time.time()
-    
-    for test_name, test_func in tests:
+
+    def run_test(test_name, test_func):
         try:
-            result = test_func()
-            results.append((test_name, result))
+            return test_name, test_func()
         except Exception as e:
             print_result(False, f"Test {test_name} crashed: {str(e)}")
-            results.append((test_name, False))
+            return test_name, False
+
+    for test_name, test_func in health_tests:
+        results.append(run_test(test_name, test_func))
+
+    print("\n⚡ Running remaining tests concurrently (output may interleave)")
+    with ThreadPoolExecutor(max_workers=len(parallel_tests)) as executor:
+        futures = [executor.submit(run_test, name, func) for name, func in parallel_tests]
+        results.extend(future.result() for future in futures)
     
     # Summary
     print("\n" + "=" * 60)
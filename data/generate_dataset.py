@@ -2,8 +2,18 @@ import pandas as pd
 import numpy as np
 import os
 import random
+import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+# Arrow's CSV writer serializes string columns in parallel C++ instead of
+# pandas' row-by-row Python path; fall back to to_csv if unavailable
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = pacsv = None
+
 # Set random seed for reproducibility
 random.seed(42)
 np.random.seed(42)
@@ -185,142 +195,292 @@ VARIABLES = {
     ]
 }
 
-# Function to fill in template with variables
+# Filler and context phrases used by the augmentation step, built once at
+# import as tuples instead of fresh lists inside the generation loop
+FILLERS_START = (
+    "I have to tell you that ", "I'm serious when I say ", "Listen carefully, ",
+    "I want you to know that ", "I'm warning you, ", "To be honest, ",
+    "Between you and me, ", "Let me be clear: ", "I'm not joking when I say ",
+    "I've been thinking and ", "For the last time, ", "Take this seriously: ",
+    "Just so you know, ", "Let me tell you something - ", "This isn't a joke: "
+)
+
+FILLERS_END = (
+    " Do you understand?", " Remember what I said.", " You've been warned.",
+    " Think about it.", " I mean it.", " This is not a joke.",
+    " Mark my words.", " Don't ignore this.", " I'm dead serious.",
+    " Keep that in mind.", " That's a promise.", " You can count on it.",
+    " I hope we're clear.", " Take it seriously.", " I won't say it again."
+)
+
+NEUTRAL_CONTEXTS = (
+    "I saw on the news that ", "My friend mentioned that ", "I read an article about how ",
+    "Did you hear about ", "I'm excited because ", "It's interesting that ",
+    "I'm a bit concerned about ", "Have you considered that ", "I was thinking about how ",
+    "It's amazing that ", "Can you believe ", "I just realized that ",
+    "My colleague told me that ", "I've been wondering if "
+)
+
+# Trailing punctuation handling for the augmentation loop: one compiled
+# regex finds the ender, and the emphasis gate maps it to its amplified form
+TRAIL_PUNCT_RE = re.compile(r'([.!?])$')
+EMPHASIS_SUFFIXES = {'.': '!!!', '!': '!!', '?': '??'}
+
+# Matches a {variable} slot in a template
+_VAR_SLOT_RE = re.compile(r'\{([^}]+)\}')
+
+# Parse every template once at import time into alternating
+# [literal, var_name, literal, ...] segments so fill_template doesn't
+# re-scan the template with a regex on every sample
+TEMPLATE_SEGMENTS = {
+    template: _VAR_SLOT_RE.split(template)
+    for templates in CATEGORIES.values()
+    for template in templates
+}
+
+# Variable indices are drawn in bulk (one vectorized np.random.randint per
+# refill) and consumed one at a time, instead of a random.choice call per slot
+_INDEX_POOL_CHUNK = 4096
+_index_pools = {}
+
+def _next_var_index(var, n_values):
+    pool = _index_pools.get(var)
+    if pool is None or pool[1] >= _INDEX_POOL_CHUNK:
+        pool = [np.random.randint(0, n_values, size=_INDEX_POOL_CHUNK), 0]
+        _index_pools[var] = pool
+    idx = pool[0][pool[1]]
+    pool[1] += 1
+    return idx
+
+def _compile_template_fn(template):
+    """
+    Generate a renderer specialized to one template: a single exec'd
+    f-string that gathers its variable picks straight from the batched
+    index pools, with the value tuples bound as default args so the hot
+    path has no dict lookups.
+    """
+    segments = _VAR_SLOT_RE.split(template)
+    namespace = {'_next': _next_var_index}
+    arg_names = []
+    body_parts = []
+
+    for i, segment in enumerate(segments):
+        if i % 2 and segment in VARIABLES:
+            values = tuple(VARIABLES[segment])
+            name = f"_v{len(arg_names)}"
+            namespace[name] = values
+            arg_names.append(name)
+            body_parts.append("{" + f"{name}[_n('{segment}', {len(values)})]" + "}")
+        elif i % 2:
+            # Unknown slot keeps its literal {name} form
+            body_parts.append('{{' + segment + '}}')
+        else:
+            body_parts.append(
+                segment.replace('\\', '\\\\').replace('{', '{{')
+                       .replace('}', '}}').replace('"', '\\"')
+            )
+
+    args = ", ".join(["_n=_next"] + [f"{name}={name}" for name in arg_names])
+    source = f'def _render({args}):\n    return f"{"".join(body_parts)}"\n'
+    exec(source, namespace)
+    return namespace['_render']
+
+# One specialized renderer per template, generated once at import
+COMPILED_TEMPLATES = {
+    category: [_compile_template_fn(template) for template in templates]
+    for category, templates in CATEGORIES.items()
+}
+
+# Function to fill in template with variables (generic fallback for
+# templates that weren't precompiled)
 def fill_template(template, vars_dict):
-    filled = template
-    
-    # Find all variables in template
-    import re
-    variables = re.findall(r'\{([^}]+)\}', template)
-    
-    # Replace each variable with a random choice from its list
-    for var in variables:
-        if var in vars_dict:
-            replacement = random.choice(vars_dict[var])
-            filled = filled.replace(f"{{{var}}}", replacement)
-    
-    return filled
+    segments = TEMPLATE_SEGMENTS.get(template)
+    if segments is None:
+        segments = _VAR_SLOT_RE.split(template)
+
+    # Odd positions are variable names, even positions are literals
+    parts = []
+    for i, segment in enumerate(segments):
+        if i % 2 and segment in vars_dict:
+            values = vars_dict[segment]
+            parts.append(values[_next_var_index(segment, len(values))])
+        elif i % 2:
+            parts.append(f"{{{segment}}}")
+        else:
+            parts.append(segment)
+
+    return ''.join(parts)
+
+# Below this size the fork/pickle overhead of worker processes outweighs
+# the per-sample Python work
+PARALLEL_THRESHOLD = 50000
+
+def _generate_batch(args):
+    """Worker entry: seed this process's RNGs, then generate one batch"""
+    batch_size, seed = args
+    random.seed(seed)
+    np.random.seed(seed)
+    return generate_threatening_dataset(batch_size, parallel=False)
 
-def generate_threatening_dataset(n_samples=10000):
+def generate_threatening_dataset(n_samples=10000, parallel=None):
     """
     Generate a dataset of threatening and non-threatening messages
-    
+
     Args:
         n_samples: Number of samples to generate
-        
+        parallel: Force parallel generation on/off; by default large runs
+            (> PARALLEL_THRESHOLD samples) are split across CPU cores
+
     Returns:
         pandas.DataFrame: Generated dataset
     """
+    if parallel is None:
+        parallel = n_samples > PARALLEL_THRESHOLD
+
+    if parallel:
+        # Samples are independent, so split across processes with
+        # deterministic per-batch seeds and concatenate
+        n_workers = os.cpu_count() or 1
+        base = n_samples // n_workers
+        sizes = [base + (1 if i < n_samples % n_workers else 0) for i in range(n_workers)]
+        jobs = [(size, 42 + i) for i, size in enumerate(sizes) if size]
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            frames = list(executor.map(_generate_batch, jobs))
+        return pd.concat(frames, ignore_index=True)
     # Determine category distribution (balanced with slight emphasis on non-threats)
     categories = list(CATEGORIES.keys())
     num_categories = len(categories)
-    
+
     # Slightly more non-threats (about 25% of the dataset)
-    category_probs = [0.12, 0.12, 0.12, 0.15, 0.15, 0.34] 
-    
-    # Generate texts and labels
-    texts = []
-    labels = []
-    
-    for _ in range(n_samples):
+    category_probs = [0.12, 0.12, 0.12, 0.15, 0.15, 0.34]
+
+    # Draw every per-sample random decision in bulk instead of making
+    # ~10 separate RNG calls inside the loop for each sample
+    cat_idx = np.random.choice(num_categories, size=n_samples, p=category_probs)
+    template_u = np.random.random(n_samples)
+    gates = np.random.random((n_samples, 7))
+
+    # Pre-draw filler/context picks in one batched call each; a slight
+    # over-draw (only ~30-50% get used) is far cheaper than a
+    # random.choice call per triggering sample
+    start_picks = random.choices(FILLERS_START, k=n_samples)
+    end_picks = random.choices(FILLERS_END, k=n_samples)
+    context_picks = random.choices(NEUTRAL_CONTEXTS, k=n_samples)
+
+    # Generate texts and labels into preallocated object arrays: no
+    # list-growth reallocation, and pandas wraps them without copying
+    texts = np.empty(n_samples, dtype=object)
+    labels = np.empty(n_samples, dtype=object)
+
+    for i in range(n_samples):
         # Select a category
-        category = np.random.choice(categories, p=category_probs)
-        
-        # Get templates for this category
-        templates = CATEGORIES[category]
-        
-        # Select and fill template
-        template = random.choice(templates)
-        text = fill_template(template, VARIABLES)
-        
+        category = categories[cat_idx[i]]
+
+        # Get the compiled templates for this category
+        templates = COMPILED_TEMPLATES[category]
+
+        # Select and render a template
+        text = templates[int(template_u[i] * len(templates))]()
+
         # Add some randomness and variation
         # Occasionally add filler phrases at beginning or end
-        if random.random() < 0.4:
-            fillers_start = [
-                "I have to tell you that ", "I'm serious when I say ", "Listen carefully, ",
-                "I want you to know that ", "I'm warning you, ", "To be honest, ",
-                "Between you and me, ", "Let me be clear: ", "I'm not joking when I say ",
-                "I've been thinking and ", "For the last time, ", "Take this seriously: ",
-                "Just so you know, ", "Let me tell you something - ", "This isn't a joke: "
-            ]
-            text = random.choice(fillers_start) + text
-        
-        if random.random() < 0.3:
-            fillers_end = [
-                " Do you understand?", " Remember what I said.", " You've been warned.",
-                " Think about it.", " I mean it.", " This is not a joke.",
-                " Mark my words.", " Don't ignore this.", " I'm dead serious.",
-                " Keep that in mind.", " That's a promise.", " You can count on it.",
-                " I hope we're clear.", " Take it seriously.", " I won't say it again."
-            ]
-            text += random.choice(fillers_end)
-            
+        if gates[i, 0] < 0.4:
+            text = start_picks[i] + text
+
+        if gates[i, 1] < 0.3:
+            text += end_picks[i]
+
         # Add additional context for non-threats to make them more diverse
-        if category == "Non-threat/Neutral" and random.random() < 0.5:
-            contexts = [
-                "I saw on the news that ", "My friend mentioned that ", "I read an article about how ",
-                "Did you hear about ", "I'm excited because ", "It's interesting that ",
-                "I'm a bit concerned about ", "Have you considered that ", "I was thinking about how ",
-                "It's amazing that ", "Can you believe ", "I just realized that ",
-                "My colleague told me that ", "I've been wondering if "
-            ]
-            text = random.choice(contexts) + text.lower()
-        
-        # Add variation in capitalization, punctuation etc. to be more realistic
-        if random.random() < 0.1:
-            text = text.upper()  # ALL CAPS
-        elif random.random() < 0.2:
-            text = text.lower()  # no caps
-            
-        # Sometimes remove ending punctuation
-        if random.random() < 0.2 and text[-1] in ".!?":
-            text = text[:-1]
-            
-        # Sometimes add extra punctuation for emphasis
-        if random.random() < 0.2:
-            if text[-1] == '.':
-                text = text[:-1] + '!!!'
-            elif text[-1] == '!':
-                text = text + '!!'
-            elif text[-1] == '?':
-                text = text + '??'
-            
-        texts.append(text)
-        labels.append(category)
-    
-    # Create dataframe
+        if category == "Non-threat/Neutral" and gates[i, 2] < 0.5:
+            text = context_picks[i] + text.lower()
+
+        # One scan of the trailing character drives both punctuation gates:
+        # sometimes strip the ending punctuation, otherwise sometimes
+        # amplify it for emphasis
+        match = TRAIL_PUNCT_RE.search(text)
+        if match is not None:
+            if gates[i, 5] < 0.2:
+                text = text[:-1]
+            elif gates[i, 6] < 0.2:
+                last = match.group(1)
+                suffix = EMPHASIS_SUFFIXES[last]
+                text = text[:-1] + suffix if last == '.' else text + suffix
+
+        texts[i] = text
+        labels[i] = category
+
+    # Add variation in capitalization to be more realistic, applied as
+    # vectorized string kernels over the whole column instead of per-row
+    # Python upper()/lower() calls (case doesn't affect the punctuation
+    # tweaks above, so the end result is the same)
+    text_series = pd.Series(texts)
+    upper_mask = gates[:, 3] < 0.1   # ALL CAPS
+    lower_mask = ~upper_mask & (gates[:, 4] < 0.2)  # no caps
+    text_series = text_series.where(~upper_mask, text_series.str.upper())
+    text_series = text_series.where(~lower_mask, text_series.str.lower())
+
+    # Shuffle via an index permutation on the underlying arrays and build
+    # the frame directly, instead of df.sample(frac=1) copying every column
+    perm = np.random.permutation(n_samples)
     df = pd.DataFrame({
-        'text': texts,
-        'label': labels
+        'text': text_series.to_numpy()[perm],
+        'label': labels[perm]
     })
-    
-    # Shuffle the dataframe
-    df = df.sample(frac=1).reset_index(drop=True)
-    
+
     return df
 
+def write_csv_batch(df, f, header):
+    """
+    Append a DataFrame batch to an open binary CSV handle, preferring
+    Arrow's parallel writer.
+    """
+    if pacsv is not None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        pacsv.write_csv(table, f, write_options=pacsv.WriteOptions(include_header=header))
+    else:
+        f.write(df.to_csv(index=False, header=header).encode('utf-8'))
+
 def main():
     # Create data directory if it doesn't exist
     data_dir = Path(__file__).parent
     data_dir.mkdir(exist_ok=True)
-    
-    # Generate data
+
+    n_samples = 10000
+    batch_size = 2000
+
+    # Generate and append in batches so peak memory stays at one batch
+    # instead of the full dataset plus its shuffled copy. Samples are
+    # drawn i.i.d., so concatenated batches are already globally shuffled.
     print("Generating threat dataset...")
-    df = generate_threatening_dataset(n_samples=10000)
-    
+    output_path = data_dir / "threat_dataset_10k.csv"
+    label_counts = None
+    df = None
+
+    with open(output_path, 'wb') as f:
+        written = 0
+        while written < n_samples:
+            df = generate_threatening_dataset(min(batch_size, n_samples - written))
+            write_csv_batch(df, f, header=(written == 0))
+            counts = df['label'].value_counts()
+            label_counts = counts if label_counts is None else label_counts.add(counts, fill_value=0)
+            written += len(df)
+
     # Print distribution
     print("\nCategory distribution:")
-    print(df['label'].value_counts())
-    
-    # Save to CSV
-    output_path = data_dir / "threat_dataset_10k.csv"
-    df.to_csv(output_path, index=False)
+    print(label_counts.astype(int))
     print(f"\nDataset saved to {output_path}")
+
+    # Examples below come from the final batch (same distribution)
     
-    # Print some examples
+    # Print some examples (one hash-partition instead of two boolean-mask
+    # scans of the full frame per category)
     print("\nExample texts:")
+    groups = {label: sub for label, sub in df.groupby('label', sort=False)}
     for category in CATEGORIES.keys():
-        examples = df[df['label'] == category].sample(min(3, len(df[df['label'] == category])))
+        sub = groups.get(category)
+        if sub is None:
+            continue
+        examples = sub.sample(min(3, len(sub)))
         print(f"\n{category}:")
         for _, row in examples.iterrows():
             print(f"  - {row['text']}")
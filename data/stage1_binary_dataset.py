@@ -3,10 +3,45 @@
 Create a binary classification dataset (Threat vs Non-threat)
 for the first stage of the two-stage threat detection model.
 """
+import numpy as np
 import pandas as pd
 import os
 from sklearn.model_selection import train_test_split
 
+# pyarrow's CSV parser and writer are parallel and SIMD-optimized; fall
+# back to the pandas reader/writer when it isn't installed
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:
+    pa = pacsv = None
+
+
+def read_dataset(input_file):
+    """
+    Read the content/class columns of the input CSV, preferring the
+    parallel pyarrow parser when available.
+    """
+    if pacsv is not None:
+        table = pacsv.read_csv(
+            input_file,
+            convert_options=pacsv.ConvertOptions(include_columns=['content', 'class'])
+        )
+        df = table.to_pandas()
+        df['class'] = df['class'].astype('category')
+        return df
+    return pd.read_csv(input_file, usecols=['content', 'class'], dtype={'class': 'category'})
+
+def write_csv(df, output_file):
+    """
+    Write a DataFrame to CSV, preferring Arrow's parallel writer.
+    """
+    if pacsv is not None:
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), output_file)
+    else:
+        df.to_csv(output_file, index=False)
+
+
 def create_binary_dataset(input_file, output_file):
     """
     Convert the multi-class threat dataset to a binary classification dataset.
@@ -16,17 +51,20 @@ def create_binary_dataset(input_file, output_file):
         output_file: Path to save the binary dataset CSV file
     """
     print(f"Reading input dataset from {input_file}")
-    df = pd.read_csv(input_file)
+    # Only the two columns we keep are parsed, and the repetitive class
+    # labels are stored as a category instead of per-row strings
+    df = read_dataset(input_file)
     
     # Print the original class distribution
     print("Original class distribution:")
     print(df['class'].value_counts())
     
-    # Convert to binary classification: 
+    # Convert to binary classification:
     # "Non-threat/Neutral" -> "Non-threat"
     # All other classes -> "Threat"
-    df['binary_class'] = df['class'].apply(
-        lambda x: "Non-threat" if x == "Non-threat/Neutral" else "Threat"
+    # (single vectorized comparison instead of a Python lambda per row)
+    df['binary_class'] = np.where(
+        df['class'].to_numpy() == "Non-threat/Neutral", "Non-threat", "Threat"
     )
     
     # Print the new binary class distribution
@@ -38,16 +76,22 @@ def create_binary_dataset(input_file, output_file):
     binary_df.rename(columns={'binary_class': 'class'}, inplace=True)
     
     # Save the binary dataset
-    binary_df.to_csv(output_file, index=False)
+    write_csv(binary_df, output_file)
     print(f"Binary dataset saved to {output_file}")
     
-    # Create train/test split to verify dataset
-    train_df, test_df = train_test_split(binary_df, test_size=0.2, random_state=42, stratify=binary_df['class'])
+    # Create train/test split to verify dataset. Splitting index arrays and
+    # writing slices avoids materializing two full DataFrame copies; sorted
+    # indices also make the writes sequential over the original rows.
+    train_idx, test_idx = train_test_split(
+        np.arange(len(binary_df)), test_size=0.2, random_state=42, stratify=binary_df['class']
+    )
+    train_idx.sort()
+    test_idx.sort()
     train_output = os.path.splitext(output_file)[0] + '_train.csv'
     test_output = os.path.splitext(output_file)[0] + '_test.csv'
-    
-    train_df.to_csv(train_output, index=False)
-    test_df.to_csv(test_output, index=False)
+
+    write_csv(binary_df.iloc[train_idx], train_output)
+    write_csv(binary_df.iloc[test_idx], test_output)
     print(f"Train dataset saved to {train_output}")
     print(f"Test dataset saved to {test_output}")
 
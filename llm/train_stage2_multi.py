@@ -46,7 +46,15 @@ def main():
     # Load dataset
     print(f"Loading data from {args.data_path}")
     try:
-        df = pd.read_csv(args.data_path)
+        # Only the two columns the pipeline uses, parsed by the
+        # multi-threaded pyarrow engine when it is available
+        try:
+            df = pd.read_csv(args.data_path, usecols=["content", "class"],
+                             dtype={"content": str, "class": str},
+                             engine="pyarrow")
+        except (ImportError, ValueError):
+            df = pd.read_csv(args.data_path, usecols=["content", "class"],
+                             dtype={"content": str, "class": str})
         print(f"Dataset loaded with {len(df)} samples")
         print("Original class distribution:")
         print(df['class'].value_counts())
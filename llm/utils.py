@@ -1,8 +1,7 @@
 import pandas as pd
 import numpy as np
 import torch
-from sklearn.metrics import classification_report, f1_score, confusion_matrix, roc_auc_score, accuracy_score
-from transformers import pipeline
+from sklearn.metrics import classification_report, f1_score, roc_auc_score, accuracy_score
 import random
 from typing import List, Dict, Tuple, Any, Optional
 
@@ -16,6 +15,17 @@ THREAT_CLASSES = [
     "Non-threat/Neutral"
 ]
 
+def _read_csv(path: str) -> pd.DataFrame:
+    """
+    Read a dataset CSV, preferring pandas' multi-threaded pyarrow engine
+    and falling back to the default C engine when it is unavailable or
+    rejects the file.
+    """
+    try:
+        return pd.read_csv(path, engine="pyarrow")
+    except (ImportError, ValueError):
+        return pd.read_csv(path)
+
 def load_and_preprocess_data(diverse_dataset_path: str, gen_ds_path: str, 
                             test_size: float = 0.2, 
                             add_synthetic: bool = True,
@@ -34,8 +44,8 @@ def load_and_preprocess_data(diverse_dataset_path: str, gen_ds_path: str,
         Tuple of (train_df, test_df)
     """
     # Load datasets
-    df1 = pd.read_csv(diverse_dataset_path)
-    df2 = pd.read_csv(gen_ds_path)
+    df1 = _read_csv(diverse_dataset_path)
+    df2 = _read_csv(gen_ds_path)
     
     # Rename columns in gen_ds if needed
     if 'content' in df2.columns and 'class' in df2.columns:
@@ -179,16 +189,24 @@ def compute_metrics(y_true: List[str], y_pred: List[str], y_proba: Optional[np.n
     metrics['f1_weighted'] = f1_score(y_true, y_pred, average='weighted')
     metrics['classification_report'] = classification_report(y_true, y_pred, output_dict=True)
     
-    # Confusion matrix
-    metrics['confusion_matrix'] = confusion_matrix(y_true, y_pred).tolist()
+    # Confusion matrix in one vectorized bincount pass; same layout as
+    # sklearn's (classes sorted, rows = true, columns = predicted)
+    cm_classes = np.unique(np.concatenate([np.asarray(y_true), np.asarray(y_pred)]))
+    n_classes = len(cm_classes)
+    t_idx = np.searchsorted(cm_classes, y_true)
+    p_idx = np.searchsorted(cm_classes, y_pred)
+    metrics['confusion_matrix'] = np.bincount(
+        t_idx * n_classes + p_idx, minlength=n_classes * n_classes
+    ).reshape(n_classes, n_classes).tolist()
     
     # AUC if probabilities are provided
     if y_proba is not None:
-        # Convert labels to indices for ROC AUC calculation
-        classes = sorted(list(set(y_true)))
-        class_to_idx = {cls: idx for idx, cls in enumerate(classes)}
-        y_true_idx = [class_to_idx[label] for label in y_true]
-        
+        # Convert labels to indices for ROC AUC calculation; np.unique
+        # returns the classes sorted, so searchsorted gives each label its
+        # index in one vectorized pass instead of a Python loop
+        classes = np.unique(y_true)
+        y_true_idx = np.searchsorted(classes, y_true)
+
         try:
             metrics['roc_auc'] = roc_auc_score(
                 np.eye(len(classes))[y_true_idx], 